@@ -1,9 +1,12 @@
 import streamlit as st
 import numpy as np
+import pandas as pd
+import altair as alt
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-from matplotlib.animation import PillowWriter
+from matplotlib.collections import PolyCollection
+from PIL import Image
 import io
+import math
 
 # Simulation parameters
 num_parts = 144
@@ -15,7 +18,7 @@ st.title("Wire Cut Simulation for Vertically Printed Plates")
 
 cut_from_top = st.radio("Wire cut starts from:", ["Top of the part", "Bottom (base of print)"])
 cut_angle_deg = st.slider("Wire angle (degrees)", min_value=-5.0, max_value=5.0, value=0.0, step=0.1)
-cut_angle_rad = np.deg2rad(cut_angle_deg)
+tan_angle = math.tan(math.radians(cut_angle_deg))
 
 tolerance_min = st.number_input("Tolerance minimum final height (inches)", min_value=0.0, max_value=plate_height, value=5.4, step=0.01)
 tolerance_max = st.number_input("Tolerance maximum final height (inches)", min_value=0.0, max_value=plate_height, value=5.5, step=0.01)
@@ -23,81 +26,110 @@ tolerance_max = st.number_input("Tolerance maximum final height (inches)", min_v
 start_height = plate_height if cut_from_top == "Top of the part" else 0.0
 
 # Calculate final height of each part
+@st.cache_data(show_spinner=False)
+def compute_heights(num_parts, plate_height, part_width, tan_angle, cut_from_top):
+    # Inputs are slider values at 0.01" resolution, so float32 is plenty.
+    # Every step works in place on the one buffer to avoid temporaries.
+    heights = np.arange(num_parts, dtype=np.float32)
+    heights *= np.float32(tan_angle * part_width)
+    if cut_from_top == "Top of the part":
+        np.subtract(plate_height, heights, out=heights)
+
+    # Clamp heights to valid range [0, plate_height]
+    return np.clip(heights, 0, plate_height, out=heights)
+
 x_positions = np.arange(num_parts)
-if cut_from_top == "Top of the part":
-    heights = plate_height - np.tan(cut_angle_rad) * x_positions * part_width
-else:
-    heights = np.tan(cut_angle_rad) * x_positions * part_width
-
-# Clamp heights to valid range [0, plate_height]
-heights = np.clip(heights, 0, plate_height)
-
-# Plot the parts and cut line
-fig, ax = plt.subplots(figsize=(12, 4))
-colors = ['green' if tolerance_min <= h <= tolerance_max else 'red' for h in heights]
-bars = ax.bar(x_positions, heights, width=0.9, color=colors)
-ax.axhline(tolerance_min, color='blue', linestyle='--', label='Min Tolerance')
-ax.axhline(tolerance_max, color='blue', linestyle='--', label='Max Tolerance')
-ax.set_ylim(0, plate_height + 0.5)
-ax.set_title("Simulated Final Heights After Wire Cut")
-ax.set_xlabel("Part Index")
-ax.set_ylabel("Final Height (inches)")
-ax.legend()
-st.pyplot(fig)
+heights = compute_heights(num_parts, plate_height, part_width, tan_angle, cut_from_top)
+
+# Plot the parts and tolerance window (rendered client-side by Vega-Lite)
+in_tol = heights >= tolerance_min
+in_tol &= heights <= tolerance_max
+colors = np.where(in_tol, 'green', 'red')
+chart_data = pd.DataFrame({
+    "Part Index": x_positions,
+    "Final Height (inches)": heights,
+    "Color": colors,
+})
+bars = alt.Chart(chart_data).mark_bar().encode(
+    x=alt.X("Part Index:O", axis=alt.Axis(values=list(range(0, num_parts, 10)), labelAngle=0)),
+    y=alt.Y("Final Height (inches):Q", scale=alt.Scale(domain=[0, plate_height + 0.5])),
+    color=alt.Color("Color:N", scale=None),
+)
+tolerance_lines = alt.Chart(pd.DataFrame({"Tolerance": [tolerance_min, tolerance_max]})).mark_rule(
+    color='blue', strokeDash=[4, 4]
+).encode(y="Tolerance:Q")
+chart = (bars + tolerance_lines).properties(title="Simulated Final Heights After Wire Cut")
+st.altair_chart(chart, use_container_width=True)
 
 # Optional: Display list of out-of-tolerance parts
-out_of_spec = np.where((heights < tolerance_min) | (heights > tolerance_max))[0]
-if len(out_of_spec) > 0:
+if not in_tol.all():
+    out_of_spec = np.flatnonzero(~in_tol)
     st.warning(f"{len(out_of_spec)} parts are outside the tolerance window.")
     st.text(f"Out-of-spec part indices: {list(out_of_spec)}")
 else:
     st.success("All parts are within tolerance.")
 
 # Animated Simulation
-def generate_animation():
-    fig, ax = plt.subplots(figsize=(12, 4))
+def compute_frame(frame, n_frames, slope, plate_height, top, wire_x, out_wire_y):
+    """Write the wire endpoint heights for `frame` (0 to n_frames-1) into `out_wire_y`."""
+    progress = frame / (n_frames - 1) * plate_height
+    y_base = plate_height - progress if top else progress
+    np.multiply(wire_x, slope, out=out_wire_y)
+    out_wire_y += y_base
+    return out_wire_y
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def generate_animation(num_parts, plate_height, part_width, tan_angle, cut_from_top, n_frames=40):
+    top = cut_from_top == "Top of the part"
+    x_positions = np.arange(num_parts)
+    heights = compute_heights(num_parts, plate_height, part_width, tan_angle, cut_from_top)
+
+    fig, ax = plt.subplots(figsize=(12, 4), facecolor="white")
     ax.set_xlim(0, num_parts)
     ax.set_ylim(0, plate_height + 0.5)
 
-    bars = ax.bar(x_positions, [plate_height] * num_parts, width=0.9, color='gray')
-    wire_line, = ax.plot([], [], 'k-', linewidth=2)
-
-    def init():
-        wire_line.set_data([], [])
-        return bars + (wire_line,)
-
-    def animate(frame):
-        wire_x = np.array([0, num_parts])
-        if cut_from_top == "Top of the part":
-            y_base = plate_height - frame / 100 * plate_height
-        else:
-            y_base = frame / 100 * plate_height
-
-        y_wire = y_base + np.tan(cut_angle_rad) * (wire_x - 0)
-        wire_line.set_data(wire_x, y_wire)
-
-        for i, bar in enumerate(bars):
-            if cut_from_top == "Top of the part":
-                cut_height = plate_height - np.tan(cut_angle_rad) * i * part_width
-            else:
-                cut_height = np.tan(cut_angle_rad) * i * part_width
-            cut_height = np.clip(cut_height, 0, plate_height)
-            bar.set_height(cut_height)
-
-        return bars + (wire_line,)
-
-    anim = animation.FuncAnimation(
-        fig, animate, init_func=init, frames=101, interval=30, blit=True
-    )
+    # Final cut heights do not depend on the frame, so draw them once up front
+    # as a single collection of 0.9-wide rectangles centred on each index
+    left = x_positions - 0.45
+    verts = np.empty((num_parts, 4, 2))
+    verts[:, [0, 3], 0] = left[:, None]
+    verts[:, [1, 2], 0] = left[:, None] + 0.9
+    verts[:, [0, 1], 1] = 0.0
+    verts[:, [2, 3], 1] = heights[:, None]
+    ax.add_collection(PolyCollection(verts, facecolors='gray', edgecolors='none'))
+    wire_line, = ax.plot([], [], 'k-', linewidth=2, animated=True)
+
+    # Wire endpoints are fixed at the plate edges; only their heights change per frame
+    wire_x = np.array([0.0, num_parts])
+    wire_y = np.empty(2)
+
+    # Render the static parts once, then blit only the wire onto that background
+    fig.canvas.draw()
+    background = fig.canvas.copy_from_bbox(fig.bbox)
+
+    # Rasterize each frame straight from the Agg canvas and map it onto the
+    # first frame's palette, instead of quantizing every frame from scratch
+    frames = []
+    palette = None
+    for frame in range(n_frames):
+        compute_frame(frame, n_frames, tan_angle, plate_height, top, wire_x, wire_y)
+        wire_line.set_data(wire_x, wire_y)
+        fig.canvas.restore_region(background)
+        ax.draw_artist(wire_line)
+        rgb = Image.fromarray(np.asarray(fig.canvas.buffer_rgba())[..., :3])
+        if palette is None:
+            palette = rgb.quantize(colors=64)
+        frames.append(rgb.quantize(palette=palette, dither=Image.Dither.NONE))
+    plt.close(fig)
 
     buf = io.BytesIO()
-    writer = PillowWriter(fps=30)
-    anim.save(buf, writer=writer, savefig_kwargs={"facecolor": "white"})
-    buf.seek(0)
-    plt.close(fig)
-    return buf
+    frames[0].save(
+        buf, format="GIF", save_all=True, append_images=frames[1:],
+        duration=50, loop=0, optimize=False,
+    )
+    return buf.getvalue()
 
 st.subheader("Wire Cutting Animation")
 if st.button("Run Animation"):
-    gif_bytes = generate_animation()
+    gif_bytes = generate_animation(num_parts, plate_height, part_width, tan_angle, cut_from_top)
     st.image(gif_bytes, format="gif")